@@ -13,9 +13,15 @@ License: MIT
 import sys
 import os
 import argparse
+import functools
+import mmap
+import stat
 import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+# Keep downloaded BPE vocabularies across runs instead of in the temp directory
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(Path.home() / ".cache" / "tiktoken"))
 
 try:
     import tiktoken
@@ -25,6 +31,57 @@ except ImportError:
     sys.exit(1)
 
 
+# Files at least this large are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD = 64 * 1024
+
+# Number of leading bytes examined when checking whether a file is binary
+BINARY_PROBE_SIZE = 1024
+
+# Bytes counted as printable text when sniffing for binary files
+PRINTABLE_BYTES = bytes([9, 10, 13]) + bytes(range(32, 127))
+
+
+@functools.lru_cache(maxsize=8)
+def get_encoder(encoding_name: str) -> "tiktoken.Encoding":
+    """Return the shared tokenizer instance for an encoding, loading it on first use."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+def warm_cache() -> List[str]:
+    """
+    Download and cache the vocabularies of every encoding used by known models.
+    
+    Returns:
+        Sorted list of the encoding names that were loaded
+    """
+    encoding_names = sorted(set(tiktoken.model.MODEL_TO_ENCODING.values()))
+    for encoding_name in encoding_names:
+        get_encoder(encoding_name)
+    return encoding_names
+
+
+def is_binary_chunk(chunk: bytes) -> bool:
+    """
+    Check if a file is likely binary by examining its first chunk.
+    
+    Args:
+        chunk: Leading bytes of the file, up to BINARY_PROBE_SIZE
+        
+    Returns:
+        True if file appears to be binary, False otherwise
+    """
+    # Keep only the non-printable bytes in a single C-level pass
+    non_printable = chunk.translate(None, delete=PRINTABLE_BYTES)
+    # Check for null bytes (common in binary files)
+    if b'\x00' in non_printable:
+        return True
+    # Check for high ratio of non-printable characters
+    if chunk and (len(chunk) - len(non_printable)) / len(chunk) < 0.7:
+        return True
+    
+    return False
+
+
 class TokenCounter:
     """A robust token counter for text files using tiktoken."""
     
@@ -36,17 +93,18 @@ class TokenCounter:
             encoding_name: The tokenizer encoding to use (default: cl100k_base)
         """
         try:
-            self.encoder = tiktoken.get_encoding(encoding_name)
+            self.encoder = get_encoder(encoding_name)
             self.encoding_name = encoding_name
         except Exception as e:
             raise RuntimeError(f"Failed to initialize tokenizer: {e}")
     
-    def count_tokens_in_file(self, filepath: str) -> Tuple[int, dict]:
+    def count_tokens_in_file(self, filepath: str, detailed: bool = True) -> Tuple[int, dict]:
         """
         Count tokens in a given text file with detailed statistics.
         
         Args:
             filepath: Path to the input file
+            detailed: If False, skip statistics that need another pass over the content
             
         Returns:
             Tuple of (token_count, file_stats)
@@ -56,23 +114,37 @@ class TokenCounter:
             UnicodeDecodeError: If the file can't be decoded as UTF-8
             PermissionError: If the file can't be read due to permissions
         """
-        file_path = Path(filepath)
-        
-        if not file_path.exists():
+        # A single stat answers existence, type and size
+        try:
+            file_stat = os.stat(filepath)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {filepath}")
         
-        if not file_path.is_file():
+        if not stat.S_ISREG(file_stat.st_mode):
             raise ValueError(f"Path is not a file: {filepath}")
         
-        # Check if file is likely binary
-        if self._is_binary_file(file_path):
-            raise ValueError(f"File appears to be binary: {filepath}")
-        
         start_time = time.time()
+        file_size = file_stat.st_size
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+            # The binary probe reuses the same open file as the content read
+            with open(filepath, 'rb') as file:
+                if file_size < MMAP_THRESHOLD:
+                    data = file.read()
+                    is_binary = is_binary_chunk(data[:BINARY_PROBE_SIZE])
+                else:
+                    is_binary = is_binary_chunk(file.read(BINARY_PROBE_SIZE))
+                
+                # Check if file is likely binary
+                if is_binary:
+                    raise ValueError(f"File appears to be binary: {filepath}")
+                
+                if file_size < MMAP_THRESHOLD:
+                    content = data.decode('utf-8')
+                else:
+                    # Decode straight from the mapped pages, skipping the read buffer copy
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        content = str(mapped, 'utf-8')
         except UnicodeDecodeError as e:
             # Fixed: Use ValueError instead of UnicodeDecodeError for custom message
             raise ValueError(
@@ -83,51 +155,25 @@ class TokenCounter:
             raise PermissionError(f"Permission denied reading file: {filepath}")
         
         # Count tokens
-        tokens = self.encoder.encode(content)
+        tokens = self.encoder.encode_ordinary(content)
         token_count = len(tokens)
         
         # Calculate statistics
         processing_time = time.time() - start_time
-        file_size = file_path.stat().st_size
         
         stats = {
             'file_size_bytes': file_size,
             'file_size_kb': file_size / 1024,
             'character_count': len(content),
-            'line_count': content.count('\n') + 1 if content else 0,
             'processing_time': processing_time,
             'tokens_per_character': token_count / len(content) if content else 0,
             'encoding': self.encoding_name
         }
         
-        return token_count, stats
-    
-    @staticmethod
-    def _is_binary_file(file_path: Path, chunk_size: int = 1024) -> bool:
-        """
-        Check if a file is likely binary by examining the first chunk.
+        if detailed:
+            stats['line_count'] = content.count('\n') + 1 if content else 0
         
-        Args:
-            file_path: Path to the file to check
-            chunk_size: Number of bytes to read for detection
-            
-        Returns:
-            True if file appears to be binary, False otherwise
-        """
-        try:
-            with open(file_path, 'rb') as file:
-                chunk = file.read(chunk_size)
-                # Check for null bytes (common in binary files)
-                if b'\x00' in chunk:
-                    return True
-                # Check for high ratio of non-printable characters
-                printable_chars = sum(1 for byte in chunk if 32 <= byte <= 126 or byte in (9, 10, 13))
-                if chunk and (printable_chars / len(chunk)) < 0.7:
-                    return True
-        except (IOError, OSError):
-            return True  # Assume binary if can't read
-        
-        return False
+        return token_count, stats
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -170,11 +216,13 @@ Examples:
   python count_tokens_file.py document.txt
   python count_tokens_file.py --quiet script.py
   python count_tokens_file.py --stats README.md
+  python count_tokens_file.py --warm-cache
         """
     )
     
     parser.add_argument(
         'filepath',
+        nargs='?',
         help='Path to the text file to analyze'
     )
     
@@ -196,6 +244,12 @@ Examples:
         help='Tokenizer encoding to use (default: cl100k_base)'
     )
     
+    parser.add_argument(
+        '--warm-cache',
+        action='store_true',
+        help='Download and cache all known tokenizer vocabularies, then exit'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -210,12 +264,25 @@ def main():
     parser = create_argument_parser()
     args = parser.parse_args()
     
+    if args.warm_cache:
+        try:
+            encoding_names = warm_cache()
+        except Exception as e:
+            print(f"❌ Error: Failed to warm tokenizer cache: {e}")
+            sys.exit(1)
+        print(f"✅ Cached encodings: {', '.join(encoding_names)}")
+        print(f"📁 Cache directory: {os.environ['TIKTOKEN_CACHE_DIR']}")
+        return
+    
+    if not args.filepath:
+        parser.error("the following arguments are required: filepath")
+    
     try:
         # Initialize token counter
         counter = TokenCounter(args.encoding)
         
         # Count tokens and get statistics
-        token_count, stats = counter.count_tokens_in_file(args.filepath)
+        token_count, stats = counter.count_tokens_in_file(args.filepath, detailed=args.stats)
         
         # Add detailed stats flag
         stats['show_detailed'] = args.stats
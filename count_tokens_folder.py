@@ -16,22 +16,61 @@ import argparse
 import time
 import csv
 import fnmatch
+import itertools
+import json
+import mmap
+import re
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Set, Tuple, Union
 from dataclasses import dataclass, field
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-try:
-    import tiktoken
-except ImportError:
-    print("❌ Error: tiktoken library not found.")
-    print("📦 Install it using: pip install tiktoken")
-    sys.exit(1)
+from count_tokens_file import BINARY_PROBE_SIZE, MMAP_THRESHOLD, get_encoder, is_binary_chunk
 
 
-@dataclass
-class FileResult:
-    """Data class to store file processing results."""
+# Tasks queued per worker process, leaving some slack for uneven batch costs
+TASKS_PER_WORKER = 4
+
+# Fixed per-file cost, in bytes of content, used when balancing batches across workers
+FILE_OVERHEAD_BYTES = 4096
+
+# Number of files whose contents are held in memory and tokenized together
+ENCODE_BATCH_SIZE = 256
+
+# Bytes of file content a batch may hold before it is tokenized, bounding memory per worker
+ENCODE_BATCH_BYTES = 16 * 1024 * 1024
+
+# Threads reading ahead the next batch of files while the current one is tokenized
+READ_AHEAD_THREADS = 8
+
+# Files larger than this are tokenized in windows of roughly this many bytes
+LARGE_FILE_WINDOW = 1 << 20
+
+# Number of CSV report rows buffered before each write
+REPORT_BATCH_SIZE = 1000
+
+# Per-folder file holding token counts from previous runs
+CACHE_FILENAME = '.token_counter_cache.json'
+
+# Extensions trusted as text or binary without sniffing the file contents
+TEXT_EXTENSIONS = frozenset({
+    '.py', '.pyi', '.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.scala', '.c', '.h',
+    '.cc', '.cpp', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.swift', '.sh', '.bash',
+    '.ps1', '.sql', '.r', '.lua', '.pl', '.md', '.rst', '.txt', '.json', '.yaml', '.yml',
+    '.toml', '.ini', '.cfg', '.conf', '.xml', '.html', '.htm', '.css', '.scss', '.csv',
+    '.tsv', '.svg',
+})
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.pdf', '.zip', '.gz',
+    '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.jar', '.whl', '.exe', '.dll', '.so',
+    '.dylib', '.o', '.a', '.lib', '.pyc', '.pyo', '.class', '.bin', '.dat', '.db',
+    '.sqlite', '.mp3', '.mp4', '.wav', '.avi', '.mov', '.woff', '.woff2', '.ttf', '.otf',
+})
+
+
+class FileResult(NamedTuple):
+    """Lightweight tuple to store file processing results."""
     path: str
     token_count: int
     file_size: int
@@ -52,6 +91,113 @@ class ProcessingStats:
     errors: List[str] = field(default_factory=list)
 
 
+class TokenCountCache:
+    """Token counts from previous runs over a folder, invalidated by file size and mtime."""
+    
+    def __init__(self, folder_path: Path, encoding_name: str):
+        """
+        Load the cache stored in a folder.
+        
+        Args:
+            folder_path: Folder whose CACHE_FILENAME holds the cached counts
+            encoding_name: Encoding the counts were produced with
+        """
+        self.cache_path = folder_path / CACHE_FILENAME
+        self.encoding_name = encoding_name
+        # Walked paths all start with this, so slicing it off gives a folder-relative key
+        self._prefix = os.path.join(str(folder_path), '')
+        self._document = self._load()
+        self._entries = self._valid_entries(self._document['encodings'].get(encoding_name))
+        self._seen: Set[str] = set()
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._updated: Dict[str, List[int]] = {}
+    
+    def split(
+        self, files: List[Tuple[str, int, int]]
+    ) -> Tuple[List[FileResult], List[Tuple[str, int, int]]]:
+        """Split file entries into results served from the cache and entries still to process."""
+        cached_results = []
+        uncached_files = []
+        
+        for file_entry in files:
+            file_path, file_size, mtime_ns = file_entry
+            key = file_path[len(self._prefix):]
+            entry = self._entries.get(key)
+            self._seen.add(key)
+            
+            if entry and entry[0] == mtime_ns and entry[1] == file_size:
+                self._updated[key] = entry
+                cached_results.append(FileResult(
+                    path=file_path,
+                    token_count=entry[2],
+                    file_size=file_size
+                ))
+            else:
+                self._pending[key] = (mtime_ns, file_size)
+                uncached_files.append(file_entry)
+        
+        return cached_results, uncached_files
+    
+    def record(self, result: FileResult):
+        """Remember the token count of a freshly processed file."""
+        key = result.path[len(self._prefix):]
+        stamp = self._pending.pop(key, None)
+        if stamp and not result.error:
+            self._updated[key] = [stamp[0], stamp[1], result.token_count]
+    
+    def save(self):
+        """
+        Atomically replace the cache file with the refreshed entries.
+        
+        Entries for files this run did not scan, for example because of include or
+        exclude patterns, are kept as long as the file still exists. Files that were
+        scanned but failed are dropped.
+        """
+        entries = {
+            key: entry for key, entry in self._entries.items()
+            if key not in self._seen and os.path.lexists(self._prefix + key)
+        }
+        entries.update(self._updated)
+        self._document['encodings'][self.encoding_name] = entries
+        
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.cache_path), prefix=f"{CACHE_FILENAME}.", suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as cache_file:
+                json.dump(self._document, cache_file, separators=(',', ':'))
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            # The cache is only an optimization, so read-only folders are not an error
+            pass
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _load(self) -> dict:
+        """Read the cache file, starting fresh if it is missing or unreadable."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as cache_file:
+                document = json.load(cache_file)
+            if isinstance(document.get('encodings'), dict):
+                return document
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {'encodings': {}}
+    
+    @staticmethod
+    def _valid_entries(entries: object) -> Dict[str, List[int]]:
+        """Keep only well-formed [mtime_ns, size, token_count] entries, so a damaged cache just misses."""
+        if not isinstance(entries, dict):
+            return {}
+        return {
+            key: entry for key, entry in entries.items()
+            if isinstance(entry, list) and len(entry) == 3
+            and all(type(value) is int for value in entry)
+        }
+
+
 class FolderTokenCounter:
     """A robust token counter for directories with advanced features."""
     
@@ -61,10 +207,10 @@ class FolderTokenCounter:
         
         Args:
             encoding_name: The tokenizer encoding to use
-            max_workers: Maximum number of threads for parallel processing
+            max_workers: Maximum number of worker processes for parallel processing
         """
         try:
-            self.encoder = tiktoken.get_encoding(encoding_name)
+            self.encoder = get_encoder(encoding_name)
             self.encoding_name = encoding_name
             self.max_workers = max_workers
         except Exception as e:
@@ -75,7 +221,9 @@ class FolderTokenCounter:
         folder_path: Union[str, Path],
         include_patterns: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None,
-        quiet: bool = False
+        quiet: bool = False,
+        use_cache: bool = False,
+        report: Optional["CsvReportWriter"] = None
     ) -> Tuple[int, ProcessingStats]:
         """
         Recursively count tokens in all files within a folder.
@@ -85,24 +233,28 @@ class FolderTokenCounter:
             include_patterns: List of file patterns to include (e.g., ['*.py', '*.js'])
             exclude_patterns: List of file patterns to exclude (e.g., ['*.log', '*.tmp'])
             quiet: If True, suppress progress output
+            use_cache: If True, reuse counts for unchanged files from CACHE_FILENAME
+                in the folder and update it afterwards
+            report: If given, each file result is written to this CSV report as it arrives
             
         Returns:
             Tuple of (total_tokens, processing_stats)
         """
-        folder_path = Path(folder_path)
-        
-        if not folder_path.exists():
-            raise FileNotFoundError(f"Folder not found: {folder_path}")
-        
-        if not folder_path.is_dir():
-            raise NotADirectoryError(f"Path is not a directory: {folder_path}")
+        folder_path = self.validate_folder(folder_path)
         
         start_time = time.time()
         stats = ProcessingStats()
         
+        # A report written inside the scanned folder must not count itself
+        skip_paths = set()
+        if report:
+            report_walk_path = self._walk_path(folder_path, report.output_path)
+            if report_walk_path:
+                skip_paths.add(report_walk_path)
+        
         # Get all files to process
         files_to_process = self._get_files_to_process(
-            folder_path, include_patterns, exclude_patterns
+            folder_path, include_patterns, exclude_patterns, skip_paths
         )
         
         stats.total_files = len(files_to_process)
@@ -112,11 +264,23 @@ class FolderTokenCounter:
             print(f"📊 Found {stats.total_files} files to process")
             print()
         
-        # Process files with progress tracking
-        results = self._process_files_parallel(files_to_process, quiet)
+        # Only files changed since the last cached run need tokenizing
+        cache = TokenCountCache(folder_path, self.encoding_name) if use_cache else None
+        cached_results = []
+        if cache:
+            cached_results, files_to_process = cache.split(files_to_process)
+        
+        results = itertools.chain(
+            cached_results, self._process_files_parallel(files_to_process, quiet)
+        )
         
-        # Compile results
+        # Compile results as they stream in from the workers
         for result in results:
+            if cache:
+                cache.record(result)
+            if report:
+                report.write(result)
+            
             if result.error:
                 stats.failed_files += 1
                 stats.errors.append(f"{result.path}: {result.error}")
@@ -129,111 +293,349 @@ class FolderTokenCounter:
                 if not quiet:
                     print(f"📄 {result.path}: {result.token_count:,} tokens")
         
+        if cache:
+            cache.save()
+        
         stats.skipped_files = stats.total_files - stats.processed_files - stats.failed_files
         stats.processing_time = time.time() - start_time
         
         return stats.total_tokens, stats
     
+    @staticmethod
+    def validate_folder(folder_path: Union[str, Path]) -> Path:
+        """
+        Check that a folder exists and is a directory.
+        
+        Raises:
+            FileNotFoundError: If the folder doesn't exist
+            NotADirectoryError: If the path is not a directory
+        """
+        folder_path = Path(folder_path)
+        
+        if not folder_path.exists():
+            raise FileNotFoundError(f"Folder not found: {folder_path}")
+        
+        if not folder_path.is_dir():
+            raise NotADirectoryError(f"Path is not a directory: {folder_path}")
+        
+        return folder_path
+    
+    @staticmethod
+    def _walk_path(folder_path: Path, file_path: str) -> Optional[str]:
+        """Spell file_path the way walking folder_path would yield it, or None if it lies outside."""
+        try:
+            relative = os.path.relpath(os.path.realpath(file_path), os.path.realpath(folder_path))
+        except ValueError:
+            # Different drives on Windows
+            return None
+        
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return os.path.join(str(folder_path), relative)
+    
     def _get_files_to_process(
         self,
         folder_path: Path,
         include_patterns: Optional[List[str]],
-        exclude_patterns: Optional[List[str]]
-    ) -> List[Path]:
-        """Get list of files to process based on patterns."""
+        exclude_patterns: Optional[List[str]],
+        skip_paths: Optional[Set[str]] = None
+    ) -> List[Tuple[str, int, int]]:
+        """Get list of (path, size, mtime_ns) entries for files to process based on patterns."""
         files = []
+        include_regex = self._compile_patterns(include_patterns)
+        exclude_regex = self._compile_patterns(exclude_patterns)
         
-        for root, _, filenames in os.walk(folder_path):
-            for filename in filenames:
-                file_path = Path(root) / filename
-                
-                # Skip if doesn't match include patterns
-                if include_patterns and not any(
-                    fnmatch.fnmatch(filename, pattern) for pattern in include_patterns
-                ):
-                    continue
-                
-                # Skip if matches exclude patterns
-                if exclude_patterns and any(
-                    fnmatch.fnmatch(filename, pattern) for pattern in exclude_patterns
-                ):
-                    continue
-                
-                # Skip binary files
-                if self._is_binary_file(file_path):
-                    continue
-                
-                files.append(file_path)
+        root = str(folder_path)
+        
+        for file_path, filename, file_size, mtime_ns in self._walk_files(root):
+            # The cache file and any leftover temp copies live in the folder root
+            if filename.startswith(CACHE_FILENAME) and os.path.dirname(file_path) == root:
+                continue
+            
+            if skip_paths and file_path in skip_paths:
+                continue
+            
+            normalized_name = os.path.normcase(filename)
+            
+            # Skip if doesn't match include patterns
+            if include_regex and not include_regex.match(normalized_name):
+                continue
+            
+            # Skip if matches exclude patterns
+            if exclude_regex and exclude_regex.match(normalized_name):
+                continue
+            
+            # Skip binary files, only sniffing contents for unknown extensions
+            extension = os.path.splitext(filename)[1].lower()
+            if extension in BINARY_EXTENSIONS:
+                continue
+            if extension not in TEXT_EXTENSIONS and self._is_binary_file(file_path):
+                continue
+            
+            files.append((file_path, file_size, mtime_ns))
         
         return files
     
-    def _process_files_parallel(self, files: List[Path], quiet: bool) -> List[FileResult]:
-        """Process files in parallel for better performance."""
-        results = []
+    @staticmethod
+    def _walk_files(folder_path: str) -> Iterator[Tuple[str, str, int, int]]:
+        """Yield (path, name, size, mtime_ns) for every file under a folder without following directory symlinks."""
+        pending = [folder_path]
+        
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                # DirEntry caches the stat result, so the size costs no extra syscall later
+                                stat_result = entry.stat()
+                                yield entry.path, entry.name, stat_result.st_size, stat_result.st_mtime_ns
+                        except OSError:
+                            continue
+            except OSError:
+                # Unreadable directories are skipped, as os.walk does
+                continue
+    
+    def _process_files_parallel(self, files: List[Tuple[str, int, int]], quiet: bool) -> Iterator[FileResult]:
+        """
+        Process files across worker processes, yielding results as each batch completes.
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_file = {
-                executor.submit(self._process_single_file, file_path): file_path
-                for file_path in files
-            }
+        Results are held per batch: only batches that have finished but not yet been
+        consumed are kept, each about len(files) / (max_workers * TASKS_PER_WORKER) results.
+        """
+        # Not worth starting worker processes for a single encoder call
+        if len(files) <= ENCODE_BATCH_SIZE or self.max_workers <= 1:
+            yield from self._process_batch(files)
+            return
+        
+        # A few batches per worker keep dispatch overhead independent of the file count
+        task_count = min(len(files), self.max_workers * TASKS_PER_WORKER)
+        batches = self._split_by_locality(files, task_count)
+        
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.encoding_name,)
+        ) as executor:
+            # as_completed drops its reference to each future once yielded, so no local
+            # list may keep finished batches alive
+            for future in as_completed([executor.submit(_process_batch, batch) for batch in batches]):
+                yield from future.result()
+    
+    @staticmethod
+    def _split_by_locality(
+        files: List[Tuple[str, int, int]], batch_count: int
+    ) -> List[List[Tuple[str, int, int]]]:
+        """
+        Split files into contiguous batches of roughly equal cost.
+        
+        The walk yields each directory subtree contiguously, so contiguous batches
+        keep every worker within one subtree, where the kernel's dentry cache and
+        readahead stay warm. Costs are balanced by size rather than file count.
+        """
+        costs = [file_size + FILE_OVERHEAD_BYTES for _, file_size, _ in files]
+        target = sum(costs) / batch_count
+        batches = []
+        start = 0
+        accumulated = 0
+        
+        for index, cost in enumerate(costs):
+            accumulated += cost
+            if accumulated >= target * (len(batches) + 1) and len(batches) < batch_count - 1:
+                batches.append(files[start:index + 1])
+                start = index + 1
+        
+        if start < len(files):
+            batches.append(files[start:])
+        return batches
+    
+    def _process_batch(self, files: List[Tuple[str, int, int]]) -> Iterator[FileResult]:
+        """
+        Tokenize a batch of files with one encoder call per chunk from _encode_chunks.
+        
+        The next chunk of files is read on a thread pool while the current one is
+        tokenized, so disk latency overlaps with encoding instead of adding to it.
+        """
+        chunks = self._encode_chunks(files)
+        if not chunks:
+            return
+        
+        with ThreadPoolExecutor(max_workers=READ_AHEAD_THREADS) as reader:
+            # Executor.map submits every read up front, so this starts reading immediately
+            pending_reads = reader.map(self._process_single_file, chunks[0])
             
-            # Collect results
-            for future in as_completed(future_to_file):
-                result = future.result()
-                results.append(result)
+            for next_chunk in chunks[1:] + [None]:
+                read_results = list(pending_reads)
+                if next_chunk is not None:
+                    pending_reads = reader.map(self._process_single_file, next_chunk)
+                yield from self._encode_batch(read_results)
+    
+    @staticmethod
+    def _encode_chunks(files: List[Tuple[str, int, int]]) -> List[List[Tuple[str, int, int]]]:
+        """Split files into chunks of at most ENCODE_BATCH_SIZE files and ENCODE_BATCH_BYTES of content."""
+        chunks = []
+        chunk: List[Tuple[str, int, int]] = []
+        chunk_bytes = 0
+        
+        for file_entry in files:
+            # Files over LARGE_FILE_WINDOW are tokenized window by window, never held whole
+            file_bytes = min(file_entry[1], LARGE_FILE_WINDOW)
+            if chunk and (
+                len(chunk) >= ENCODE_BATCH_SIZE or chunk_bytes + file_bytes > ENCODE_BATCH_BYTES
+            ):
+                chunks.append(chunk)
+                chunk = []
+                chunk_bytes = 0
+            
+            chunk.append(file_entry)
+            chunk_bytes += file_bytes
+        
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    
+    def _encode_batch(self, read_results: List[Tuple[FileResult, Optional[str]]]) -> List[FileResult]:
+        """Tokenize the contents of a batch of read files in a single encoder call."""
+        results = [result for result, _ in read_results]
+        pending = [index for index, (_, content) in enumerate(read_results) if content is not None]
+        
+        if pending:
+            start_time = time.time()
+            token_lists = self.encoder.encode_ordinary_batch(
+                [read_results[index][1] for index in pending], num_threads=self.max_workers
+            )
+            encode_time = (time.time() - start_time) / len(pending)
+            
+            for index, tokens in zip(pending, token_lists):
+                result = results[index]
+                results[index] = result._replace(
+                    token_count=len(tokens),
+                    processing_time=result.processing_time + encode_time
+                )
         
         return results
     
-    def _process_single_file(self, file_path: Path) -> FileResult:
-        """Process a single file and return results."""
+    def _process_single_file(self, file_entry: Tuple[str, int, int]) -> Tuple[FileResult, Optional[str]]:
+        """
+        Read a single file, returning its result stub and decoded content.
+        
+        Files larger than LARGE_FILE_WINDOW are tokenized here window by window,
+        in which case the result already holds the token count and no content is returned.
+        """
+        file_path, file_size, _ = file_entry
         start_time = time.time()
+        token_count = 0
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
-            
-            tokens = self.encoder.encode(content)
-            token_count = len(tokens)
-            file_size = file_path.stat().st_size
+            with open(file_path, 'rb') as file:
+                if file_size < MMAP_THRESHOLD:
+                    content = file.read().decode('utf-8', errors='ignore')
+                else:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        if len(mapped) > LARGE_FILE_WINDOW:
+                            token_count = self._count_tokens_in_windows(mapped)
+                            content = None
+                        else:
+                            content = str(mapped, 'utf-8', 'ignore')
             
             return FileResult(
-                path=str(file_path),
+                path=file_path,
                 token_count=token_count,
                 file_size=file_size,
                 processing_time=time.time() - start_time
-            )
+            ), content
             
         except Exception as e:
             return FileResult(
-                path=str(file_path),
+                path=file_path,
                 token_count=0,
                 file_size=0,
                 error=str(e),
                 processing_time=time.time() - start_time
-            )
+            ), None
+    
+    def _count_tokens_in_windows(self, mapped: mmap.mmap) -> int:
+        """Tokenize a mapped file in whitespace-aligned windows so memory stays bounded."""
+        token_count = 0
+        windows = []
+        start = 0
+        
+        # Slicing the view decodes straight from the mapping, where slicing the mmap would copy
+        with memoryview(mapped) as view:
+            while start < len(mapped):
+                end = self._window_end(mapped, start)
+                windows.append(str(view[start:end], 'utf-8', 'ignore'))
+                start = end
+                
+                if len(windows) >= self.max_workers or start >= len(mapped):
+                    token_lists = self.encoder.encode_ordinary_batch(windows, num_threads=self.max_workers)
+                    token_count += sum(len(tokens) for tokens in token_lists)
+                    windows = []
+        
+        return token_count
+    
+    @staticmethod
+    def _window_end(mapped: mmap.mmap, start: int) -> int:
+        """Find where the window starting at start should end, preferring a newline or space."""
+        end = start + LARGE_FILE_WINDOW
+        if end >= len(mapped):
+            return len(mapped)
+        
+        limit = min(end + LARGE_FILE_WINDOW, len(mapped))
+        for separator in (b'\n', b' '):
+            position = mapped.find(separator, end, limit)
+            if position >= 0:
+                return position + 1
+        
+        # No whitespace nearby, so at least avoid splitting a UTF-8 sequence. Those are
+        # at most 4 bytes long; past that the data is not UTF-8 and 'ignore' decoding
+        # copes with a cut anywhere
+        for offset in range(4):
+            if not 0x80 <= mapped[end - offset] <= 0xBF:
+                return end - offset
+        return end
     
     @staticmethod
-    def _is_binary_file(file_path: Path, chunk_size: int = 1024) -> bool:
+    def _compile_patterns(patterns: Optional[List[str]]) -> Optional[Pattern[str]]:
+        """Combine glob patterns into a single regex matched against normalized file names."""
+        if not patterns:
+            return None
+        return re.compile('|'.join(
+            fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns
+        ))
+    
+    @staticmethod
+    def _is_binary_file(file_path: Union[str, Path]) -> bool:
         """Check if a file is likely binary."""
         try:
-            with open(file_path, 'rb') as file:
-                chunk = file.read(chunk_size)
-                if not chunk:
-                    return False
-                
-                # Check for null bytes
-                if b'\x00' in chunk:
-                    return True
-                
-                # Check for high ratio of non-printable characters
-                printable_chars = sum(1 for byte in chunk if 32 <= byte <= 126 or byte in (9, 10, 13))
-                return (printable_chars / len(chunk)) < 0.7
-                
+            # A raw descriptor avoids building a buffered file object for a single read
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                chunk = os.read(fd, BINARY_PROBE_SIZE)
+            finally:
+                os.close(fd)
         except (IOError, OSError):
             return True
         
-        return False
+        return is_binary_chunk(chunk)
+
+
+# Counter used by a worker process, created once by the pool initializer
+_worker_counter: Optional[FolderTokenCounter] = None
+
+
+def _init_worker(encoding_name: str):
+    """Load the tokenizer once per worker process."""
+    global _worker_counter
+    _worker_counter = FolderTokenCounter(encoding_name, max_workers=1)
+
+
+def _process_batch(files: List[Tuple[str, int, int]]) -> List[FileResult]:
+    """Process a batch of files in a worker process."""
+    return list(_worker_counter._process_batch(files))
 
 
 def format_size(size_bytes: int) -> str:
@@ -246,22 +648,60 @@ def format_size(size_bytes: int) -> str:
     return f"{size:.1f} TB"
 
 
-def generate_csv_report(results: List[FileResult], output_path: str):
-    """Generate a detailed CSV report of the analysis."""
-    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['file_path', 'token_count', 'file_size_bytes', 'file_size_formatted', 'processing_time']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+class CsvReportWriter:
+    """Streams successful file results into a detailed CSV report as they arrive."""
+    
+    FIELDNAMES = ['file_path', 'token_count', 'file_size_bytes', 'file_size_formatted', 'processing_time']
+    
+    def __init__(self, output_path: str):
+        """
+        Create the report file and write its header.
+        
+        Args:
+            output_path: Path of the CSV file to write
+        """
+        self.output_path = output_path
+        self._file = open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDNAMES)
+        self._writer.writeheader()
+        self._rows: List[dict] = []
+    
+    def write(self, result: FileResult):
+        """Add a result to the report, skipping files that failed."""
+        if result.error:
+            return
         
-        writer.writeheader()
+        self._rows.append({
+            'file_path': result.path,
+            'token_count': result.token_count,
+            'file_size_bytes': result.file_size,
+            'file_size_formatted': format_size(result.file_size),
+            'processing_time': f"{result.processing_time:.3f}"
+        })
+        if len(self._rows) >= REPORT_BATCH_SIZE:
+            self._flush_rows()
+    
+    def close(self):
+        """Write any buffered rows and close the report file."""
+        self._flush_rows()
+        self._file.close()
+    
+    def _flush_rows(self):
+        self._writer.writerows(self._rows)
+        self._rows = []
+    
+    def __enter__(self) -> "CsvReportWriter":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def generate_csv_report(results: Iterable[FileResult], output_path: str):
+    """Generate a detailed CSV report of the analysis."""
+    with CsvReportWriter(output_path) as report:
         for result in results:
-            if not result.error:
-                writer.writerow({
-                    'file_path': result.path,
-                    'token_count': result.token_count,
-                    'file_size_bytes': result.file_size,
-                    'file_size_formatted': format_size(result.file_size),
-                    'processing_time': f"{result.processing_time:.3f}"
-                })
+            report.write(result)
 
 
 def print_summary(folder_path: str, total_tokens: int, stats: ProcessingStats, quiet: bool = False):
@@ -304,7 +744,7 @@ def create_argument_parser() -> argparse.ArgumentParser:
 Examples:
   python count_tokens_folder.py ./my_project
   python count_tokens_folder.py --filter "*.py,*.js" ./src
-  python count_tokens_folder.py --exclude "*.log,*.tmp" --report ./project
+  python count_tokens_folder.py --exclude "*.log,*.tmp" --report report.csv ./project
   python count_tokens_folder.py --quiet ./docs
         """
     )
@@ -336,6 +776,12 @@ Examples:
         help='Generate detailed CSV report (specify output filename)'
     )
     
+    parser.add_argument(
+        '-c', '--cache',
+        action='store_true',
+        help=f'Reuse token counts for unchanged files, stored in {CACHE_FILENAME} in the folder'
+    )
+    
     parser.add_argument(
         '--encoding',
         default='cl100k_base',
@@ -346,7 +792,7 @@ Examples:
         '--max-workers',
         type=int,
         default=4,
-        help='Maximum number of parallel workers (default: 4)'
+        help='Maximum number of worker processes (default: 4)'
     )
     
     parser.add_argument(
@@ -376,25 +822,37 @@ def main():
         # Initialize counter
         counter = FolderTokenCounter(args.encoding, args.max_workers)
         
-        # Process folder
-        total_tokens, stats = counter.count_tokens_in_folder(
-            args.folder_path,
-            include_patterns,
-            exclude_patterns,
-            args.quiet
-        )
-        
-        # Generate CSV report if requested
+        # Open the CSV report up front so rows are written while files are processed,
+        # but only once the folder is known to exist
+        FolderTokenCounter.validate_folder(args.folder_path)
+        report = None
         if args.report:
-            # We'd need to collect results differently for CSV generation
-            # This is a simplified version - in production, you'd modify the counter
-            # to return detailed results
-            if not args.quiet:
-                print(f"📊 CSV report generation not yet implemented in this version")
+            try:
+                report = CsvReportWriter(args.report)
+            except OSError as e:
+                print(f"❌ Error: Cannot write report - {args.report}: {e}")
+                sys.exit(1)
+        
+        # Process folder
+        try:
+            total_tokens, stats = counter.count_tokens_in_folder(
+                args.folder_path,
+                include_patterns,
+                exclude_patterns,
+                args.quiet,
+                args.cache,
+                report
+            )
+        finally:
+            if report:
+                report.close()
         
         # Print summary
         print_summary(args.folder_path, total_tokens, stats, args.quiet)
         
+        if report and not args.quiet:
+            print(f"\n📊 CSV report saved to: {args.report}")
+        
     except FileNotFoundError:
         print(f"❌ Error: Directory not found - {args.folder_path}")
         print("💡 Please check the directory path and try again.")